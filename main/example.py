@@ -1,18 +1,12 @@
 import random
 import tkinter as tk
+import tkinter.messagebox as messagebox
 import chess
 from main.tk_widgets.display_board import DisplayBoard
 from main.tk_widgets.san_list import SanListFrame
 from main.opening.opening_explorer_widget import OpeningExplorerWidget
 
 
-def rgb_to_hex(col):
-    if isinstance(col, str):
-        return col
-    r, g, b = col
-    return f"#{r:02x}{g:02x}{b:02x}"
-
-
 # noinspection PyTypeChecker
 class ChessAnalyzerApp:
     def __init__(self):
@@ -92,11 +86,12 @@ class ChessAnalyzerApp:
 
         def apply():
             self.o_m.last_opening_name = None
-            self.o_m.set_fen(self.board.fen())
             if node.parent:
+                # the replayed push fires on_move, which already updates the explorer
                 self.board.board.set_fen(node.parent.fen)
-                move = self.board.board.parse_san(node.san)
-                self.board.push(move, True)
+                self.board.push(node.move, True)
+            else:
+                self.o_m.set_fen(self.board.fen())
 
         self.board.set_fen_with_animation(fen, apply)
         self.board.clear_user_draw()
@@ -106,7 +101,8 @@ class ChessAnalyzerApp:
 
     def on_move(self, move, board_widget: DisplayBoard):
         board_widget.clear_last_move_quality()
-        c = board_widget.clone_board()
+        # copy only the last ply of history (O(1) in game length) and step back on the copy
+        c = board_widget.clone_board(stack=1)
         c.pop()
         san = c.san(move)
         self.o_m.set_fen(board_widget.fen())
@@ -126,9 +122,8 @@ class ChessAnalyzerApp:
     def export_svg(self):
         self.root.withdraw()
         path = tk.filedialog.asksaveasfilename(defaultextension=".svg")
-        if path:
-            with open(path, "w", encoding="utf-8") as f:
-                f.write(self.board.generate_svg())
+        if path and not self.board.export_svg(path):
+            messagebox.showerror("Export SVG", f"Could not write file: {path}")
         self.root.deiconify()
 
     def export_pgn(self):
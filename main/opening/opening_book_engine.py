@@ -25,6 +25,7 @@ from __future__ import annotations
 import csv
 import sqlite3
 import re
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional, Any
 import chess
@@ -33,30 +34,25 @@ import time
 # CONFIG
 CACHE_FILENAME = "book_tree_cache.sqlite"
 
-# Regexes to clean PGN-like moves field
-_RE_BRACES = re.compile(r"\{[^}]*\}")
-_RE_PARENS = re.compile(r"\([^)]*\)")
-_RE_NAG = re.compile(r"\$\d+")
-_RE_MOVE_NUM = re.compile(r"\b\d+\.(\.\.)?")
-_RE_RESULT = re.compile(r"\b1-0\b|\b0-1\b|\b1/2-1/2\b|\*\b", re.I)
+# One alternation for everything stripped from a PGN-like moves field:
+# comments, variations, NAGs, move numbers, results and stray punctuation
+_RE_PGN_NOISE = re.compile(
+    r"\{[^}]*\}"
+    r"|\([^)]*\)"
+    r"|\$\d+"
+    r"|\b\d+\.(?:\.\.)?"
+    r"|\b1-0\b|\b0-1\b|\b1/2-1/2\b|\*\b"
+    r"|[;,:]+",
+    re.I,
+)
 
 
 def _clean_pgn_to_tokens(pgn: str) -> List[str]:
     """Strip comments, variations, NAGs, move numbers and results; split into SAN tokens."""
     if not pgn:
         return []
-    s = pgn
-    s = _RE_BRACES.sub(" ", s)
-    s = _RE_PARENS.sub(" ", s)
-    s = _RE_NAG.sub(" ", s)
-    s = _RE_MOVE_NUM.sub(" ", s)
-    s = _RE_RESULT.sub(" ", s)
-    s = re.sub(r"[;,:]+", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    if not s:
-        return []
-    toks = [t for t in s.split(" ") if t and not t.isdigit()]
-    return toks
+    # a single substitution pass; split() without arguments also collapses the whitespace
+    return [t for t in _RE_PGN_NOISE.sub(" ", pgn).split() if not t.isdigit()]
 
 
 def _normalize_header(h: str) -> str:
@@ -74,7 +70,7 @@ def _guess_delim_from_sample(sample: str) -> Optional[str]:
 
 
 class OpeningNode:
-    __slots__ = ("fen", "continuations", "children", "names_counter", "eco_counter")
+    __slots__ = ("fen", "continuations", "children", "names_counter", "eco_counter", "top_name", "top_eco")
 
     def __init__(self, fen: str):
         self.fen: str = fen
@@ -82,6 +78,13 @@ class OpeningNode:
         self.children: Dict[str, str] = {}        # uci -> child_fen
         self.names_counter: Dict[str, int] = {}   # opening name -> count (final fen only)
         self.eco_counter: Dict[str, int] = {}     # eco -> count (final fen only)
+        self.top_name: Optional[str] = None       # most frequent name / eco, see update_top()
+        self.top_eco: Optional[str] = None
+
+    def update_top(self):
+        """Recompute top_name / top_eco from the counters (call after the counters change)."""
+        self.top_name = max(self.names_counter.items(), key=itemgetter(1))[0] if self.names_counter else None
+        self.top_eco = max(self.eco_counter.items(), key=itemgetter(1))[0] if self.eco_counter else None
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -102,32 +105,39 @@ class OpeningBookTree:
         self.board = chess.Board()
         self.nodes: Dict[str, OpeningNode] = {}  # fen -> OpeningNode
         self._ensure_cache_and_load()
+        # top opening name (or None) of every position from the root of self.board to the current one
+        self._name_stack: List[Optional[str]] = []
+        self._rebuild_name_stack()
 
     # ---------------- cache management ----------------
     def _ensure_cache_and_load(self):
         tsv_mtime = self.tsv_path.stat().st_mtime
         if self.cache_path.exists() and self.cache_path.stat().st_mtime >= tsv_mtime:
-            self._load_from_sqlite()
-        else:
-            self._build_from_tsv_and_save()
+            try:
+                self._load_from_sqlite()
+                return
+            except sqlite3.DatabaseError:
+                # unreadable / corrupt cache -> rebuild it from the TSV
+                self.nodes = {}
+        self._build_from_tsv_and_save()
 
     # ---------------- building ----------------
+    def _iter_tsv_rows(self):
+        """Yield the non-empty rows of the book file, streaming it in a single pass."""
+        with self.tsv_path.open("r", encoding="utf-8", newline="") as f:
+            # sniff the delimiter from the head of the file, then rewind and stream
+            delim = _guess_delim_from_sample(f.read(65536)) or "\t"
+            f.seek(0)
+            for r in csv.reader(f, delimiter=delim):
+                if any(cell.strip() for cell in r):
+                    yield r
+
     def _build_from_tsv_and_save(self):
-        sample = self.tsv_path.read_text(encoding="utf-8")
-        delim = _guess_delim_from_sample(sample) or "\t"
-
-        rows = []
-        with self.tsv_path.open("r", encoding="utf-8") as f:
-            reader = csv.reader(f, delimiter=delim)
-            for r in reader:
-                if not any(cell.strip() for cell in r):
-                    continue
-                rows.append(r)
-
-        if not rows:
+        rows = self._iter_tsv_rows()
+        header = next(rows, None)
+        if header is None:
             raise ValueError("Empty book file")
 
-        header = rows[0]
         header_norm = [_normalize_header(h) for h in header]
 
         # find indexes
@@ -155,7 +165,11 @@ class OpeningBookTree:
         root_node.names_counter["Starting board"] = 1
         root_node.eco_counter[""] = 1  # אפשר להשאיר ריק אם אין ECO
 
-        for row in rows[1:]:
+        # book lines share long prefixes: resolve each (position, SAN) pair only once,
+        # remembering the move, its uci and the child key so repeated prefixes skip parse_san and epd()
+        san_cache: Dict[Tuple[str, str], Tuple[chess.Move, str, str]] = {}
+
+        for row in rows:
             if moves_idx >= len(row):
                 continue
             moves_field = row[moves_idx].strip()
@@ -167,17 +181,22 @@ class OpeningBookTree:
                 continue
 
             b = chess.Board()
-            prev_fen = self._fen_key(b)
+            prev_fen = root_fen
 
             for tok in tokens:
-                try:
-                    mv = b.parse_san(tok)
-                except Exception:
-                    # cannot parse token here — stop processing this line
-                    prev_fen = None
-                    break
-                uci = mv.uci()
-                child_fen = self._fen_key_after_move(b, mv)
+                hit = san_cache.get((prev_fen, tok))
+                if hit is None:
+                    try:
+                        mv = b.parse_san(tok)
+                    except Exception:
+                        # cannot parse token here — stop processing this line
+                        prev_fen = None
+                        break
+                    b.push(mv)
+                    hit = san_cache[(prev_fen, tok)] = (mv, mv.uci(), b.epd())
+                else:
+                    b.push(hit[0])
+                _, uci, child_fen = hit
 
                 # ensure nodes exist
                 self._ensure_node(prev_fen)
@@ -189,7 +208,6 @@ class OpeningBookTree:
                 node.children[uci] = child_fen
 
                 # advance
-                b.push(mv)
                 prev_fen = child_fen
 
             # at the end of the PGN line, register opening name / ECO for the final fen (if parsed fully)
@@ -199,6 +217,9 @@ class OpeningBookTree:
                 if eco_field:
                     node_final.eco_counter[eco_field] = node_final.eco_counter.get(eco_field, 0) + 1
 
+        for node in self.nodes.values():
+            node.update_top()
+
         # save to sqlite
         self._save_to_sqlite()
 
@@ -207,126 +228,127 @@ class OpeningBookTree:
             self.nodes[fen] = OpeningNode(fen)
 
     def _fen_key(self, board: chess.Board) -> str:
-        return " ".join(board.fen().split()[:4])
-
-    def _fen_key_after_move(self, board: chess.Board, move: chess.Move) -> str:
-        # make a copy to avoid mutating caller
-        tmp = board.copy()
-        tmp.push(move)
-        return self._fen_key(tmp)
+        # EPD without operations == the first four FEN fields, without formatting and discarding the clocks
+        return board.epd()
 
     # ---------------- sqlite persistence ----------------
     def _save_to_sqlite(self):
-        if self.cache_path.exists():
+        # write to a side file and move it into place only once complete, so an interrupted
+        # write never leaves a half-written cache at cache_path
+        tmp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        if tmp_path.exists():
             try:
-                self.cache_path.unlink()
+                tmp_path.unlink()
             except Exception:
                 pass
-        conn = sqlite3.connect(str(self.cache_path))
+        conn = sqlite3.connect(str(tmp_path))
         cur = conn.cursor()
+        # the side file is disposable, so durability pragmas can be relaxed
         cur.execute("PRAGMA synchronous = OFF")
+        cur.execute("PRAGMA journal_mode = MEMORY")
+        cur.execute("PRAGMA cache_size = -65536")
+        cur.execute("PRAGMA temp_store = MEMORY")
+        cur.execute("BEGIN")
         cur.execute("CREATE TABLE nodes (fen TEXT PRIMARY KEY, name TEXT, eco TEXT)")
         cur.execute("CREATE TABLE continuations (fen TEXT, uci TEXT, freq INTEGER, child_fen TEXT)")
+
+        def node_rows():
+            # we store the most frequent name/eco for convenience (or NULL)
+            for fen, node in self.nodes.items():
+                yield fen, node.top_name, node.top_eco
+
+        def cont_rows():
+            for fen, node in self.nodes.items():
+                for uci, freq in node.continuations.items():
+                    yield fen, uci, freq, node.children.get(uci)
+
+        # rows are streamed straight from the tree; the index is built once, after the bulk insert
+        cur.executemany("INSERT INTO nodes (fen, name, eco) VALUES (?, ?, ?)", node_rows())
+        cur.executemany("INSERT INTO continuations (fen, uci, freq, child_fen) VALUES (?, ?, ?, ?)", cont_rows())
         cur.execute("CREATE INDEX idx_cont_fen ON continuations(fen)")
-        # insert nodes (we store the most frequent name/eco for convenience)
-        node_rows = []
-        cont_rows = []
-        for fen, node in self.nodes.items():
-            # choose top name/eco or NULL
-            name = None
-            eco = None
-            if node.names_counter:
-                name = max(node.names_counter.items(), key=lambda kv: kv[1])[0]
-            if node.eco_counter:
-                eco = max(node.eco_counter.items(), key=lambda kv: kv[1])[0]
-            node_rows.append((fen, name, eco))
-            for uci, freq in node.continuations.items():
-                child = node.children.get(uci)
-                cont_rows.append((fen, uci, freq, child))
-        cur.executemany("INSERT INTO nodes (fen, name, eco) VALUES (?, ?, ?)", node_rows)
-        if cont_rows:
-            cur.executemany("INSERT INTO continuations (fen, uci, freq, child_fen) VALUES (?, ?, ?, ?)", cont_rows)
         conn.commit()
         conn.close()
+        tmp_path.replace(self.cache_path)
 
     def _load_from_sqlite(self):
         conn = sqlite3.connect(str(self.cache_path))
-        cur = conn.cursor()
-        self.nodes = {}
-        for fen, name, eco in cur.execute("SELECT fen, name, eco FROM nodes"):
-            node = OpeningNode(fen)
-            if name:
-                node.names_counter[name] = 1
-            if eco:
-                node.eco_counter[eco] = 1
-            self.nodes[fen] = node
-        for fen, uci, freq, child in cur.execute("SELECT fen, uci, freq, child_fen FROM continuations"):
-            self._ensure_node(fen)
-            node = self.nodes[fen]
-            node.continuations[uci] = freq
-            if child:
-                node.children[uci] = child
-            # ensure child node exists (to keep structure)
-            if child:
-                self._ensure_node(child)
-        conn.close()
+        try:
+            cur = conn.cursor()
+            self.nodes = {}
+            for fen, name, eco in cur.execute("SELECT fen, name, eco FROM nodes"):
+                node = OpeningNode(fen)
+                if name:
+                    node.names_counter[name] = 1
+                    node.top_name = name
+                if eco:
+                    node.eco_counter[eco] = 1
+                    node.top_eco = eco
+                self.nodes[fen] = node
+            for fen, uci, freq, child in cur.execute("SELECT fen, uci, freq, child_fen FROM continuations"):
+                self._ensure_node(fen)
+                node = self.nodes[fen]
+                node.continuations[uci] = freq
+                if child:
+                    node.children[uci] = child
+                # ensure child node exists (to keep structure)
+                if child:
+                    self._ensure_node(child)
+        finally:
+            conn.close()
+
+    # ---------------- opening names ----------------
+    def _name_at(self, board: chess.Board) -> Optional[str]:
+        node = self.nodes.get(self._fen_key(board))
+        return node.top_name if node else None
+
+    def _rebuild_name_stack(self):
+        b = self.board.root()
+        self._name_stack = [self._name_at(b)]
+        for mv in self.board.move_stack:
+            b.push(mv)
+            self._name_stack.append(self._name_at(b))
 
     # ---------------- API ----------------
     def reset(self):
         self.board.reset()
+        self._rebuild_name_stack()
 
     def set_fen(self, fen: str):
         self.board.set_fen(fen)
+        self._rebuild_name_stack()
 
     def push_uci(self, uci: str):
         m = chess.Move.from_uci(uci)
         if m not in self.board.legal_moves:
             raise ValueError(f"Move {uci} not legal here")
         self.board.push(m)
+        self._name_stack.append(self._name_at(self.board))
 
     def pop(self):
         if self.board.move_stack:
             self.board.pop()
+            self._name_stack.pop()
 
     def legal_continuations(self) -> List[Tuple[str, int]]:
         fen = self._fen_key(self.board)
         node = self.nodes.get(fen)
         if not node:
             return []
-        # filter to legal moves
-        items: List[Tuple[str, int]] = []
-        for uci, freq in node.continuations.items():
-            try:
-                m = chess.Move.from_uci(uci)
-            except Exception:
-                continue
-            if m in self.board.legal_moves:
-                items.append((uci, freq))
-        items.sort(key=lambda x: -x[1])
+        # filter to legal moves (generated once; book ucis come from Move.uci(), so strings compare directly)
+        legal = {m.uci() for m in self.board.legal_moves}
+        items: List[Tuple[str, int]] = [(uci, freq) for uci, freq in node.continuations.items() if uci in legal]
+        items.sort(key=itemgetter(1), reverse=True)
         return items
 
     def current_opening_name(self) -> Optional[str]:
         """
         Return the most specific opening name available along the path from the start to the current position.
-        We traverse the move_stack from the root and pick the deepest node that has a name.
+        The deepest named position wins; names are tracked incrementally on push_uci/pop/set_fen/reset.
         """
-        tmp = self.board.copy()
-        best_name = None
-        # check root too (some lines might name the starting position, though rare)
-        root_fen = self._fen_key(tmp)
-        root_node = self.nodes.get(root_fen)
-        if root_node and root_node.names_counter:
-            best_name = max(root_node.names_counter.items(), key=lambda kv: kv[1])[0]
-
-        for mv in self.board.move_stack:
-            tmp.push(mv)
-            fen = self._fen_key(tmp)
-            node = self.nodes.get(fen)
-            if node and node.names_counter:
-                # pick most frequent name at this fen
-                name = max(node.names_counter.items(), key=lambda kv: kv[1])[0]
-                best_name = name
-        return best_name
+        if len(self._name_stack) != len(self.board.move_stack) + 1:
+            # self.board was moved without going through the API
+            self._rebuild_name_stack()
+        return next((name for name in reversed(self._name_stack) if name), None)
 
     def node_for_fen(self, fen: str) -> Optional[Dict[str, Any]]:
         key = " ".join(fen.split()[:4])
@@ -346,9 +368,7 @@ class OpeningBookTree:
         node = self.nodes.get(key)
         if not node:
             return None
-        if not node.eco_counter:
-            return None
-        return max(node.eco_counter.items(), key=lambda kv: kv[1])[0]
+        return node.top_eco
 
 
 # ---------------- standalone test (no GUI) ----------------
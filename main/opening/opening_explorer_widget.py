@@ -8,11 +8,15 @@ BOOK_TSV = "book.tsv"
 CACHE_DB = "book_tree_cache.sqlite"
 
 class OpeningExplorerWidget(tk.Frame):
+    REFRESH_DELAY_MS = 50  # coalesce bursts of set_fen (e.g. holding an arrow key) into one rebuild
+
     def __init__(self, master, tsv_path: str, cache_path: str = CACHE_DB, move_callback=None):
         super().__init__(master, bg="#1e1e1e")
         self.book = OpeningBookTree(tsv_path, cache_path)
         self.move_callback = move_callback
         self.last_opening_name = None
+        self._shown_key = None  # book key (EPD) of the position currently displayed
+        self._refresh_after_id = None
         self._build_ui()
         self._refresh()
 
@@ -70,6 +74,10 @@ class OpeningExplorerWidget(tk.Frame):
 
     # --- רענון תוכן ---
     def _refresh(self):
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        self._shown_key = self.book._fen_key(self.book.board)
         name = self.book.current_opening_name() or self.last_opening_name or "—"
         self.last_opening_name = name
         self.opening_lbl.config(text=name)
@@ -83,27 +91,21 @@ class OpeningExplorerWidget(tk.Frame):
             except Exception:
                 san = uci
             tag = "even" if i % 2 == 0 else "odd"
-            self.tree.insert("", "end", text=san, tags=(tag,))
+            self.tree.insert("", "end", text=san, values=(uci,), tags=(tag,))
 
     # --- טיפול בלחיצה כפולה ---
     def _on_double_click(self, _event):
         sel = self.tree.selection()
         if not sel:
             return
-        iid = sel[0]
-        san = self.tree.item(iid, "text")
-
-        items = self.book.legal_continuations()
-        uci = None
-        for move_uci, _ in items:
-            try:
-                if self.book.board.san(chess.Move.from_uci(move_uci)) == san:
-                    uci = move_uci
-                    break
-            except Exception:
-                continue
-        if not uci:
+        if self.book._fen_key(self.book.board) != self._shown_key:
+            # the rows belong to a position the book has already left (refresh still pending)
+            self._refresh()
             return
+        values = self.tree.item(sel[0], "values")
+        if not values:
+            return
+        uci = values[0]
 
         child_fen = self.book.get_child_fen(self.book.board.fen(), uci)
         if child_fen:
@@ -121,11 +123,23 @@ class OpeningExplorerWidget(tk.Frame):
     # --- API ללוח חיצוני ---
     def set_fen(self, fen: str):
         self.book.set_fen(fen)
-        self._refresh()
+        # same position already shown -> nothing to rebuild (resetting last_opening_name forces a refresh)
+        if self.last_opening_name is not None and self.book._fen_key(self.book.board) == self._shown_key:
+            return
+        # the book follows immediately; the view is rebuilt once the position settles
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+        self._refresh_after_id = self.after(self.REFRESH_DELAY_MS, self._refresh)
     def reset(self):
         self.book.reset()
         self._refresh()
 
+    def destroy(self):
+        if self._refresh_after_id is not None:
+            self.after_cancel(self._refresh_after_id)
+            self._refresh_after_id = None
+        super().destroy()
+
 
 # ---------------- demo ----------------
 if __name__ == "__main__":
@@ -178,7 +178,7 @@ class WhiteBlackBar(tk.Frame):
 # -------------------------
 # Background analyzer (simulated advantage)
 # -------------------------
-@dataclass
+@dataclass(slots=True)
 class AnalysisVal:
     # advantage in [-1.0, +1.0] (negative -> favor black, positive -> favor white)
     advantage: float
@@ -189,6 +189,9 @@ class BackgroundAnalyzer:
     Background thread that computes an 'advantage' in [-1..1] for the current board.
     It schedules UI updates via the provided scheduler function.
     """
+    # white probability is quantized to 1/EMIT_RESOLUTION before deciding whether to notify the UI
+    EMIT_RESOLUTION = 1000
+
     def __init__(self, schedule_fn: Callable[[Callable, Tuple], None],
                  ui_update_fn: Callable[[float, float], None],
                  poll_interval: float = 0.12):
@@ -202,9 +205,11 @@ class BackgroundAnalyzer:
 
         self._thread = threading.Thread(target=self._loop, name="BackgroundAnalyzer", daemon=True)
         self._stop = threading.Event()
+        # set by set_board()/stop() so the worker reacts without waiting out the poll interval
+        self._wake = threading.Event()
 
-        # board state (string representation)
-        self._board = "startpos"
+        # board state (string representation); None until the first set_board()
+        self._board: Optional[str] = None
         self._lock = threading.Lock()
         self._version = 0
 
@@ -216,17 +221,23 @@ class BackgroundAnalyzer:
         self._thread.start()
 
     def set_board(self, board_repr: str):
-        """Set board representation; increments version. Returns new version."""
+        """Set board representation; increments version. Returns new version.
+        Re-setting the position that is already being analysed is a no-op and returns the current version.
+        """
         with self._lock:
+            if board_repr == self._board:
+                return self._version
             self._board = board_repr
             self._version += 1
             v = self._version
             # compute deterministic new target advantage
             self._target_adv = self._compute_advantage_from_board(board_repr)
+        self._wake.set()
         return v
 
     def stop(self):
         self._stop.set()
+        self._wake.set()
         self._thread.join(timeout=0.6)
 
     def _compute_advantage_from_board(self, board_repr: str) -> float:
@@ -243,9 +254,17 @@ class BackgroundAnalyzer:
         adv *= 0.85
         return max(-1.0, min(1.0, adv))
 
+    def _ui_call(self, white_prob: float, black_prob: float):
+        """Runs on the UI thread; shared by every tick instead of a per-tick closure."""
+        try:
+            self._ui_update(white_prob, black_prob)
+        except Exception:
+            pass
+
     def _loop(self):
         """Worker loop: slowly approach target advantage and schedule UI updates."""
         last_version = -1
+        last_emitted = None
         while not self._stop.is_set():
             with self._lock:
                 board = self._board
@@ -271,16 +290,15 @@ class BackgroundAnalyzer:
             white_prob = 0.5 * (1.0 + adv_with_jitter)
             black_prob = 1.0 - white_prob
 
-            # schedule UI update (ensure UI thread does the actual widget work)
-            def _ui_call(wp=white_prob, bp=black_prob):
-                try:
-                    self._ui_update(wp, bp)
-                except Exception:
-                    pass
-
-            self._schedule(_ui_call, ())
+            # schedule UI update (ensure UI thread does the actual widget work),
+            # skipping the round-trip when the bar would not visibly change
+            emitted = round(white_prob * self.EMIT_RESOLUTION)
+            if emitted != last_emitted:
+                last_emitted = emitted
+                self._schedule(self._ui_call, (white_prob, black_prob))
 
-            time.sleep(self._poll)
+            self._wake.wait(self._poll)
+            self._wake.clear()
 
 
 # -------------------------
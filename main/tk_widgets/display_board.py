@@ -57,7 +57,7 @@ import math
 import tkinter as tk
 import tkinter.font
 from enum import Enum, auto
-from gc import callbacks
+from functools import lru_cache
 from typing import Callable, Optional, Tuple
 
 import chess
@@ -76,6 +76,24 @@ class MoveQuality(Enum):
     MISS = auto()
 
 
+# square -> (row, col) in drawing coordinates (row 0 = rank 8); orientation is applied at draw time
+_ROW_COL = tuple((7 - chess.square_rank(sq), chess.square_file(sq)) for sq in chess.SQUARES)
+
+
+@lru_cache(maxsize=64)
+def _hex_from_rgb(r, g, b):
+    # bit-packing would silently fold an out-of-range channel into another one, so reject it
+    if not (0 <= r <= 255 and 0 <= g <= 255 and 0 <= b <= 255):
+        raise ValueError(f"RGB channels must be in 0..255, got {(r, g, b)}")
+    return "#%06x" % ((r << 16) | (g << 8) | b)
+
+
+@lru_cache(maxsize=32)
+def _badge_hex(color):
+    """Background and darkened outline hex for a move-quality badge colour."""
+    outline = tuple(max(0, min(255, int(c * 0.6))) for c in color)
+    return _hex_from_rgb(*color), _hex_from_rgb(*outline)
+
 
 class DisplayBoard(tk.Frame):
     """
@@ -205,6 +223,7 @@ class DisplayBoard(tk.Frame):
         self.auto_stop_animation = auto_stop_animation
         self._anim_after_id = None
         self._anim_data = []
+        self._redraw_after_id = None  # pending safe_redraw(), coalesced
         self.highlighted_move: chess.Move | None = None
         self._last_move_quality: Optional[MoveQuality] = None
 
@@ -318,8 +337,10 @@ class DisplayBoard(tk.Frame):
         This method is useful for visualizing how pieces are moving during a game of chess by identifying which squares have had changes in their occupancy between the initial and final states.
         """
         moves_for_animation = []
-        cur = [i for i in from_.piece_map().items() if i not in to.piece_map().items()]
-        tar = [i for i in to.piece_map().items() if i not in from_.piece_map().items()]
+        from_items = from_.piece_map().items()
+        to_items = to.piece_map().items()
+        cur = [i for i in from_items if i not in to_items]
+        tar = [i for i in to_items if i not in from_items]
         for sq, trg in tar:
             found = None
             for sr, curr in cur:
@@ -333,18 +354,19 @@ class DisplayBoard(tk.Frame):
 
     @staticmethod
     def rgb_to_hex(col):
-        """Convert an (r,g,b) tuple to a hex color string, or return string as-is."""
+        """Convert an (r,g,b) tuple to a hex color string, or return string as-is.
+        Raises ValueError if a channel is outside 0..255."""
         if isinstance(col, str):
             return col
         r, g, b = col
-        return f"#{r:02x}{g:02x}{b:02x}"
+        return _hex_from_rgb(r, g, b)
 
     @staticmethod
     def row_col_of(square):
         """Return (row, col) used for drawing rectangles from a chess.Square.
         Drawing uses top-left origin where row 0 is top of the canvas.
         """
-        return 7 - chess.square_rank(square), chess.square_file(square)
+        return _ROW_COL[square]
 
     def _frames_for_duration(self, duration: Optional[float] = None) -> int:
         """
@@ -544,8 +566,8 @@ class DisplayBoard(tk.Frame):
             start_square = self.square_at(*self._right_click_start)
             end_square = self.square_at(x, y)
             if start_square is not None and end_square is not None:
-                start_row, start_col = 7 - chess.square_rank(start_square), chess.square_file(start_square)
-                end_row, end_col = 7 - chess.square_rank(end_square), chess.square_file(end_square)
+                start_row, start_col = _ROW_COL[start_square]
+                end_row, end_col = _ROW_COL[end_square]
                 if start_square == end_square:
                     self.draw_circle(start_row, start_col, self.circle_color, int(self.square_size / 2.1),
                                      self.circle_width)
@@ -755,8 +777,7 @@ class DisplayBoard(tk.Frame):
         cx = col * self.square_size + (self.square_size - pad - radius)
         cy = row * self.square_size + (pad + radius)
 
-        bg_hex = self.rgb_to_hex(color)
-        outline_hex = self.rgb_to_hex(tuple(max(0, min(255, int(c * 0.6))) for c in color))
+        bg_hex, outline_hex = _badge_hex(tuple(color))
 
 
 
@@ -788,8 +809,7 @@ class DisplayBoard(tk.Frame):
         if self.show_legal:
             for move in self.legal_moves:
                 if move.from_square == self._selected_square:
-                    to_sq = move.to_square
-                    r, c = 7 - chess.square_rank(to_sq), chess.square_file(to_sq)
+                    r, c = _ROW_COL[move.to_square]
                     self.draw_circle(r, c, self.legal_moves_circles_color, self.legal_moves_circles_radius,
                                      self.legal_moves_circles_width, False)
 
@@ -944,7 +964,7 @@ class DisplayBoard(tk.Frame):
         • BLUNDER (??)
         """
         self._last_move_quality = quality
-        self.after(0, self.redraw)
+        self.safe_redraw()
 
     def clear_user_draw(self, highlights: bool = True, circles: bool = True, arrows: bool = True,last_move: bool = False):
         """Clear overlay lists selectively."""
@@ -1009,7 +1029,7 @@ class DisplayBoard(tk.Frame):
         self.start_animation(move.to_square, move.from_square, self._pop_animation_function, False)
         return move
 
-    def clone_board(self) -> chess.Board:
+    def clone_board(self, stack: bool | int = True) -> chess.Board:
         """
         Return a detached copy of the current board state.
 
@@ -1020,8 +1040,11 @@ class DisplayBoard(tk.Frame):
         • External inspection
 
         The returned board shares NO mutable state with the widget.
+
+        `stack` is passed to chess.Board.copy: False copies no move history (the
+        current position only), an int copies just that many of the latest plies.
         """
-        return self.board.copy()
+        return self.board.copy(stack=stack)
 
     def make_move(self, from_square, to_square, promo_piece=None, callback: bool = True, animate: bool = True) -> Optional[chess.Move]:
         """
@@ -1207,7 +1230,8 @@ class DisplayBoard(tk.Frame):
         self.highlighted_move = None
         self._selected_square = None
         self.clear_last_move_quality()
-        a = self.map_pieces_for_animation(self.clone_board(), chess.Board(fen=fen))
+        # map_pieces_for_animation only reads piece placement, no need to clone the board (and its stack)
+        a = self.map_pieces_for_animation(self.board, chess.Board(fen=fen))
         if not a:
             self.set_fen(fen)
         else:
@@ -1231,7 +1255,8 @@ class DisplayBoard(tk.Frame):
         Returns:
             str: The SVG string representing the chessboard.
         """
-        svg = f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.board_size}" height="{self.board_size}">\n'
+        parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.board_size}" height="{self.board_size}">\n']
+        add = parts.append
 
         # Draw squares
         for r in range(8):
@@ -1240,13 +1265,13 @@ class DisplayBoard(tk.Frame):
                 x = c * self.square_size
                 y = r * self.square_size
                 hex_color = self.rgb_to_hex(color)
-                svg += f'<rect x="{x}" y="{y}" width="{self.square_size}" height="{self.square_size}" fill="{hex_color}" />\n'
+                add(f'<rect x="{x}" y="{y}" width="{self.square_size}" height="{self.square_size}" fill="{hex_color}" />\n')
 
         if last_move and self.highlighted_move:
             r,c = self.row_col_of(self.highlighted_move.from_square)
-            svg += f'<rect x="{c * self.square_size}" y="{r * self.square_size}" width="{self.square_size}" height="{self.square_size}" fill="{self.rgb_to_hex(self.from_color)}" />\n'
+            add(f'<rect x="{c * self.square_size}" y="{r * self.square_size}" width="{self.square_size}" height="{self.square_size}" fill="{self.rgb_to_hex(self.from_color)}" />\n')
             r, c = self.row_col_of(self.highlighted_move.to_square)
-            svg += f'<rect x="{c * self.square_size}" y="{r * self.square_size}" width="{self.square_size}" height="{self.square_size}" fill="{self.rgb_to_hex(self.to_color)}" />\n'
+            add(f'<rect x="{c * self.square_size}" y="{r * self.square_size}" width="{self.square_size}" height="{self.square_size}" fill="{self.rgb_to_hex(self.to_color)}" />\n')
 
 
         if highlights:
@@ -1256,7 +1281,7 @@ class DisplayBoard(tk.Frame):
                 x = cc * self.square_size
                 y = rr * self.square_size
                 hex_color = self.rgb_to_hex(color)
-                svg += f'<rect x="{x}" y="{y}" width="{self.square_size}" height="{self.square_size}" fill="none" stroke="{hex_color}" stroke-width="3"/>\n'
+                add(f'<rect x="{x}" y="{y}" width="{self.square_size}" height="{self.square_size}" fill="none" stroke="{hex_color}" stroke-width="3"/>\n')
 
         # Draw pieces (as text)
         font_size = int(self.square_size * 0.7)
@@ -1269,7 +1294,7 @@ class DisplayBoard(tk.Frame):
                     cx = cc * self.square_size + self.square_size / 2
                     cy = rr * self.square_size + self.square_size / 2
                     symbol = self.UNICODE_PIECES[piece.symbol()]
-                    svg += f'<text x="{cx}" y="{cy}" font-size="{font_size}" text-anchor="middle" dominant-baseline="middle">{symbol}</text>\n'
+                    add(f'<text x="{cx}" y="{cy}" font-size="{font_size}" text-anchor="middle" dominant-baseline="middle">{symbol}</text>\n')
 
         if circles:
             # Draw circles
@@ -1278,7 +1303,7 @@ class DisplayBoard(tk.Frame):
                 cx = cc * self.square_size + self.square_size / 2
                 cy = rr * self.square_size + self.square_size / 2
                 hex_color = self.rgb_to_hex(color)
-                svg += f'<circle cx="{cx}" cy="{cy}" r="{radius}" fill="none" stroke="{hex_color}" stroke-width="{width}"/>\n'
+                add(f'<circle cx="{cx}" cy="{cy}" r="{radius}" fill="none" stroke="{hex_color}" stroke-width="{width}"/>\n')
 
         if arrows:
             # Draw arrows
@@ -1292,7 +1317,7 @@ class DisplayBoard(tk.Frame):
                 hex_color = self.rgb_to_hex(color)
                 left, right = self._get_arrow_cords(x1, x2, y1, y2)
 
-                svg += (
+                add(
                     f'<line x1="{x1}" y1="{y1}" x2="{x2}" y2="{y2}" stroke="{hex_color}" stroke-width="{width}"/>\n'
                     f'<line x1="{x2}" y1="{y2}" x2="{left[0]}" y2="{left[1]}" stroke="{hex_color}" stroke-width="{width}"/>\n'
                     f'<line x1="{x2}" y1="{y2}" x2="{right[0]}" y2="{right[1]}" stroke="{hex_color}" stroke-width="{width}"/>\n'
@@ -1303,10 +1328,10 @@ class DisplayBoard(tk.Frame):
             color = self.move_quality_colors.get(self._last_move_quality, (0, 0, 0))
             symbol = self.quality_symbols.get(self._last_move_quality, " ")
             radius,cx,cy,bg_hex,outline_hex,font_size = self._get_move_quality_draw_info(color,symbol,self.highlighted_move.to_square)
-            svg += f'<circle cx="{cx}" cy="{cy}" r="{radius}" fill="{bg_hex}" stroke="{outline_hex}" stroke-width="{max(2, int(radius * 0.18))}"/>\n'
-            svg += f'<text x="{cx}" y="{cy}" font-family="Arial" font-size="{max(8, int(radius * 0.9))}" fill="black" text-anchor="middle" dominant-baseline="middle">{symbol}</text>\n'
-        svg += "</svg>"
-        return svg
+            add(f'<circle cx="{cx}" cy="{cy}" r="{radius}" fill="{bg_hex}" stroke="{outline_hex}" stroke-width="{max(2, int(radius * 0.18))}"/>\n')
+            add(f'<text x="{cx}" y="{cy}" font-family="Arial" font-size="{max(8, int(radius * 0.9))}" fill="black" text-anchor="middle" dominant-baseline="middle">{symbol}</text>\n')
+        add("</svg>")
+        return "".join(parts)
 
     def export_svg(self, path: str, highlights: bool = True, circles: bool = True, arrows: bool = True,last_move:bool = True,quality:bool = True) -> bool:
         """
@@ -1324,8 +1349,9 @@ class DisplayBoard(tk.Frame):
             bool: True if the export was successful, False otherwise.
         """
         try:
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(self.generate_svg(highlights, circles, arrows,last_move,quality))
+            data = self.generate_svg(highlights, circles, arrows,last_move,quality).encode('utf-8')
+            with open(path, 'wb') as f:
+                f.write(data)
             return True
         except OSError:
             return False
@@ -1348,15 +1374,30 @@ class DisplayBoard(tk.Frame):
 
     def safe_redraw(self):
         """
-        Schedule the redraw method to be called after a delay of 0 milliseconds.
+        Schedule the redraw method to be called once Tk is idle.
 
         This method ensures that the redraw operation is not called immediately, allowing
-        other events or tasks to complete before the redraw occurs. The use of `after(0)` with the redraw method
-        helps in maintaining a smooth and responsive user interface by deferring the drawing action.
+        other events or tasks to complete before the redraw occurs. Calls made while a redraw is
+        already pending are coalesced, so a burst of updates (e.g. from an analysis callback)
+        repaints the canvas only once.
+
+        The pending id is shared between callers and is not returned; use cancel_redraw()
+        to drop a scheduled redraw.
 
         No parameters are required for this method.
         """
-        return self.after(0, self.redraw)
+        if self._redraw_after_id is None:
+            self._redraw_after_id = self.after_idle(self._idle_redraw)
+
+    def cancel_redraw(self):
+        """Cancel a redraw scheduled by safe_redraw(), if any; later calls schedule normally again."""
+        if self._redraw_after_id is not None:
+            self.after_cancel(self._redraw_after_id)
+            self._redraw_after_id = None
+
+    def _idle_redraw(self):
+        self._redraw_after_id = None
+        self.redraw()
 
     def set_board(self, board: chess.Board, animate: bool = False, callback=None):
         """
@@ -4,7 +4,6 @@ from __future__ import annotations
 
 import io
 import tkinter as tk
-import tkinter.colorchooser as colorchooser
 import tkinter.filedialog as filedialog
 import tkinter.messagebox as messagebox
 import tkinter.simpledialog as simpledialog
@@ -44,6 +43,7 @@ class SanListFrame(tk.Frame):
 
         Attributes:
             san (str): The SAN representation of the move.
+            move (chess.Move | None): The move itself, so it can be replayed without re-parsing the SAN.
             fen (str): The FEN string representing the board state after the move.
             move_number (int): The number of the move in the sequence.
             color (str): The color of the player who made the move ("white" or "black").
@@ -60,7 +60,7 @@ class SanListFrame(tk.Frame):
             is_root() -> bool: Checks if this node is the root of the tree (i.e., has no parent).
         """
         __slots__ = (
-            "san", "fen", "move_number", "color", "parent",
+            "san", "move", "fen", "move_number", "color", "parent",
             "node_children", "comment", "nags", "annot_color","extras"
         )
 
@@ -72,8 +72,10 @@ class SanListFrame(tk.Frame):
                 color: str | None,
                 parent: "SanListFrame._Node | None" = None,
                 comment: str | None = None,
+                move: chess.Move | None = None,
         ):
             self.san = san
+            self.move = move
             self.fen = fen
             self.move_number = move_number
             self.color = color  # "white" or "black"
@@ -190,7 +192,8 @@ class SanListFrame(tk.Frame):
         board.push(mv)
         color = "white" if prior_turn == chess.WHITE else "black"
         move_number = board.fullmove_number if color == "white" else board.fullmove_number - 1
-        node = SanListFrame._Node(san=san, fen=board.fen(), move_number=move_number, color=color, parent=parent)
+        node = SanListFrame._Node(san=san, fen=board.fen(), move_number=move_number, color=color, parent=parent,
+                                  move=mv)
         return node
 
     @staticmethod
@@ -300,21 +303,24 @@ class SanListFrame(tk.Frame):
         """
         board = chess.Board(fen=self._starting_fen)
 
-        # collect SAN moves from root -> selected
-        moves: list[str] = []
+        # collect nodes from root -> selected
+        path: list[SanListFrame._Node] = []
         node = self._selected
 
         while node and not node.is_root():
             if node.san:
-                moves.append(node.san)
+                path.append(node)
             node = node.parent
 
-        # apply moves in correct order
-        for san in reversed(moves):
+        # apply moves in correct order (stored move when available, SAN otherwise)
+        for node in reversed(path):
+            if node.move is not None:
+                board.push(node.move)
+                continue
             try:
-                board.push(board.parse_san(san))
+                board.push(board.parse_san(node.san))
             except Exception as e:
-                raise ValueError(f"Failed to rebuild board from SAN '{san}': {e}")
+                raise ValueError(f"Failed to rebuild board from SAN '{node.san}': {e}")
 
         return board
 
@@ -347,44 +353,43 @@ class SanListFrame(tk.Frame):
 
         board = chess.Board(fen=self._starting_fen)
 
-        def rec(pgn_node: chess.pgn.ChildNode | chess.pgn.Game, parent_node: SanListFrame._Node):
-            for var in pgn_node.variations:
-                mv = var.move
-                san = board.san(mv)
-                # create a child for this variation under parent_node
-                child = SanListFrame._Node(san=san, fen=None, move_number=0, color=None, parent=parent_node)
-                parent_node.add_child(child)
-
-                # push move on board to compute fen and move numbers for this child subtree
-                board.push(mv)
-                # update child's fen and metadata properly
-                prior_turn = not board.turn  # because we've already pushed
-                color = "white" if prior_turn == chess.WHITE else "black"
-                move_number = board.fullmove_number if color == "white" else board.fullmove_number - 1
-                child.fen = board.fen()
-                child.color = color
-                child.move_number = move_number
-
-                # copy comment and NAGs if present
-                try:
-                    if getattr(var, "comment", None):
-                        child.comment = var.comment
-                except Exception:
-                    pass
-                try:
-                    if getattr(var, "nags", None):
-                        child.nags = set(var.nags) if var.nags else set()
-                except Exception:
-                    pass
-
-                # recurse into this node
-                rec(var, child)
-
-                # pop after finishing this variation subtree
-                board.pop()
-
-        # start from root of PGN (game)
-        rec(game, self._root)
+        # depth-first walk with an explicit stack (one frame per pushed move) so long games don't hit the
+        # recursion limit; every frame except the root's has its move pushed on `board`
+        stack = [(iter(game.variations), self._root)]
+        while stack:
+            variations, parent_node = stack[-1]
+            var = next(variations, None)
+            if var is None:
+                stack.pop()
+                if stack:
+                    # pop after finishing this variation subtree
+                    board.pop()
+                continue
+
+            mv = var.move
+            san = board.san(mv)
+            # create a child for this variation under parent_node
+            child = SanListFrame._Node(san=san, fen=None, move_number=0, color=None, parent=parent_node, move=mv)
+            parent_node.add_child(child)
+
+            # push move on board to compute fen and move numbers for this child subtree
+            board.push(mv)
+            # update child's fen and metadata properly
+            prior_turn = not board.turn  # because we've already pushed
+            color = "white" if prior_turn == chess.WHITE else "black"
+            move_number = board.fullmove_number if color == "white" else board.fullmove_number - 1
+            child.fen = board.fen()
+            child.color = color
+            child.move_number = move_number
+
+            # copy comment and NAGs if present
+            if var.comment:
+                child.comment = var.comment
+            if var.nags:
+                child.nags = set(var.nags)
+
+            # descend into this node
+            stack.append((iter(var.variations), child))
 
         # set selected to end of mainline if exists
         node = self._root
@@ -407,8 +412,9 @@ class SanListFrame(tk.Frame):
         self._node_tag.clear()
         self._tag_node.clear()
 
-        # Render recursively (inline variations)
-        def render_node(node: SanListFrame._Node, is_var: bool = False):
+        # Render inline variations recursively; returns the next mainline node (the caller loops over the
+        # mainline instead of recursing, so long games don't hit the recursion limit)
+        def render_node(node: SanListFrame._Node, is_var: bool = False) -> SanListFrame._Node | None:
 
             style = "variation" if is_var else "mainline"
 
@@ -472,7 +478,7 @@ class SanListFrame(tk.Frame):
                 pass
 
             if not node.node_children:
-                return
+                return None
 
             main_child = node.node_children[0] if node.node_children else None
             variations = node.node_children[1:] if len(node.node_children) > 1 else []
@@ -491,11 +497,12 @@ class SanListFrame(tk.Frame):
                 self._text.insert(tk.END, ") ", "paren")
 
             # continue mainline (do not render if currently rendering a variation)
-            if not is_var and main_child:
-                render_node(main_child, is_var=False)
+            return None if is_var else main_child
 
         # Start
-        render_node(self._root)
+        node = self._root
+        while node is not None:
+            node = render_node(node)
 
         # highlight current
         try:
@@ -612,31 +619,35 @@ class SanListFrame(tk.Frame):
         """
         root = self._root
         game = chess.pgn.Game()
-        exporter_board = chess.Board(fen=root.fen)
-
-        def rec_build(parent_pgn_node: chess.pgn.ChildNode, san_node: SanListFrame._Node, board: chess.Board):
-            for idx, child in enumerate(san_node.node_children):
+        board = chess.Board(fen=root.fen)
+
+        # explicit-stack depth-first walk (see _load_game_tree); non-root frames have their move pushed
+        stack = [(iter(root.node_children), game)]
+        while stack:
+            children, parent_pgn_node = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if stack:
+                    board.pop()
+                continue
+
+            mv = child.move
+            if mv is None:
                 try:
                     mv = board.parse_san(child.san)
                 except Exception as e:
                     raise ValueError(f"Invalid SAN '{child.san}' relative to FEN {board.fen()}: {e}")
-                new_pgn_node = parent_pgn_node.add_variation(mv)
-                # comments
-                if getattr(child, "comment", None):
-                    new_pgn_node.comment = child.comment
-                # preserve nags
-                if getattr(child, "nags", None):
-                    try:
-                        new_pgn_node.nags.update(child.nags)
-                    except Exception:
-                        for code in child.nags:
-                            new_pgn_node.nags.add(code)
-                # push and recurse
-                board.push(mv)
-                rec_build(new_pgn_node, child, board)
-                board.pop()
-
-        rec_build(game, root, exporter_board)
+            new_pgn_node = parent_pgn_node.add_variation(mv)
+            # comments
+            if child.comment:
+                new_pgn_node.comment = child.comment
+            # preserve nags
+            if child.nags:
+                new_pgn_node.nags.update(child.nags)
+            # push and descend
+            board.push(mv)
+            stack.append((iter(child.node_children), new_pgn_node))
         return game
 
     def export_pgn(self, file_path: str | None = None) -> str | None:
@@ -681,13 +692,13 @@ class SanListFrame(tk.Frame):
         """Return a list of nodes whose SAN matches (search entire tree)."""
         res: list[SanListFrame._Node] = []
 
-        def rec(n: SanListFrame._Node):
-            for c in n.node_children:
-                if c.san == san:
-                    res.append(c)
-                rec(c)
-
-        rec(self._root)
+        # pre-order walk with an explicit stack (children pushed reversed to keep document order)
+        stack = list(reversed(self._root.node_children))
+        while stack:
+            c = stack.pop()
+            if c.san == san:
+                res.append(c)
+            stack.extend(reversed(c.node_children))
         return res
 
     def _trigger_callback(self):
@@ -711,7 +722,7 @@ if __name__ == "__main__":
         def at_end():
             if node.is_root():return
             display_board.set_fen(node.parent.fen)
-            display_board.push(display_board.board.parse_san(node.san))
+            display_board.push(node.move)
         display_board.set_fen_with_animation(fen,at_end)
     def on_move(move: chess.Move, board):
         m = board.board.pop()